@@ -1,5 +1,6 @@
 from airflow import DAG
 from airflow.operators.python import PythonOperator
+from airflow.hooks.base import BaseHook
 from airflow.providers.postgres.hooks.postgres import PostgresHook
 import requests
 import pandas as pd
@@ -21,9 +22,10 @@ def fetch_data(**kwargs):
         "filter": "orders",
         "sortBy": "asc"
     }
+    conn = BaseHook.get_connection('rapidapi_aliexpress')
     headers = {
-        "x-rapidapi-key": "efbc12a764msh39a81e663d3e104p1e76acjsn337fd1d56751",
-        "x-rapidapi-host": "aliexpress-business-api.p.rapidapi.com"
+        "x-rapidapi-key": conn.extra_dejson['key'],
+        "x-rapidapi-host": conn.host
     }
 
     try:
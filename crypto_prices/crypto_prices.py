@@ -1,13 +1,17 @@
 from airflow import DAG
 from airflow.operators.python import PythonOperator, ShortCircuitOperator
+from airflow.operators.email import EmailOperator
 from airflow.providers.postgres.hooks.postgres import PostgresHook
 from airflow.utils.dates import days_ago
-from airflow.models import Variable
+from psycopg2.extras import execute_values
 from datetime import timedelta, datetime
 import requests
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# HTTP session for CoinGecko requests
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])))
 
 # Default arguments for the DAG
 default_args = {
@@ -19,6 +23,15 @@ default_args = {
     'retry_delay': timedelta(minutes=5),
 }
 
+# Plain text report rendered from the fetch task's XCom at send time
+REPORT_TEMPLATE = """<pre>
+Symbol | Price (USD) | 24h Change (%)
+----------------------------------------
+{% for crypto in ti.xcom_pull(task_ids='fetch_crypto_prices') -%}
+{{ crypto.symbol }} | ${{ '%.2f' | format(crypto.price_usd) }} | {{ '%.2f' | format(crypto.change_24h) }}%
+{% endfor -%}
+</pre>"""
+
 def fetch_crypto_prices():
     url = "https://api.coingecko.com/api/v3/simple/price"
     parameters = {
@@ -27,7 +40,7 @@ def fetch_crypto_prices():
         'include_24hr_change': 'true'
     }
     try:
-        response = requests.get(url, params=parameters)
+        response = SESSION.get(url, params=parameters, timeout=(3, 10))
         response.raise_for_status()
         data = response.json()
 
@@ -51,56 +64,17 @@ def insert_into_postgres(**kwargs):
     
     insert_query = """
     INSERT INTO crypto_prices (symbol, price_usd, change_24h, timestamp)
-    VALUES (%s, %s, %s, NOW())
+    VALUES %s
     """
     
-    for crypto in crypto_data:
-        cursor.execute(insert_query, (crypto['symbol'], crypto['price_usd'], crypto['change_24h']))
+    # Insert all coins in a single multi-row statement
+    rows = [(crypto['symbol'], crypto['price_usd'], crypto['change_24h']) for crypto in crypto_data]
+    execute_values(cursor, insert_query, rows, template="(%s, %s, %s, NOW())", page_size=1000)
     
     connection.commit()
     cursor.close()
     connection.close()
 
-def send_email(**kwargs):
-    ti = kwargs['ti']
-    crypto_data = ti.xcom_pull(task_ids='fetch_crypto_prices')
-    if not crypto_data:
-        raise ValueError("No data received from fetch task")
-    
-    # Generate report as plain text
-    report_lines = ["Symbol | Price (USD) | 24h Change (%)", "-" * 40]
-    for crypto in crypto_data:
-        line = f"{crypto['symbol']} | ${crypto['price_usd']:.2f} | {crypto['change_24h']:.2f}%"
-        report_lines.append(line)
-    
-    report_text = "\n".join(report_lines)
-    
-    # Retrieve SMTP settings from Airflow Variables
-    smtp_host = Variable.get("smtp_host")
-    smtp_port = int(Variable.get("smtp_port", default_var=587))
-    smtp_username = Variable.get("smtp_username")
-    smtp_password = Variable.get("smtp_password")
-    sender_email = Variable.get("sender_email")
-    receiver_emails = Variable.get("receiver_emails")
-    
-    # Create email
-    msg = MIMEMultipart()
-    msg['From'] = sender_email
-    msg['To'] = receiver_emails
-    msg['Subject'] = "Daily Crypto Prices Report"
-    
-    msg.attach(MIMEText(report_text, 'plain'))
-    
-    # Send email
-    try:
-        server = smtplib.SMTP(smtp_host, smtp_port)
-        server.starttls()
-        server.login(smtp_username, smtp_password)
-        server.sendmail(sender_email, receiver_emails.split(','), msg.as_string())
-        server.quit()
-    except Exception as e:
-        raise Exception(f"Failed to send email: {str(e)}")
-
 def check_send_time(**kwargs):
     # Send email only at 8 AM daily
     logical_date = kwargs['logical_date']
@@ -118,7 +92,9 @@ with DAG(
     fetch_task = PythonOperator(
         task_id='fetch_crypto_prices',
         python_callable=fetch_crypto_prices,
-        do_xcom_push=True
+        do_xcom_push=True,
+        pool='coingecko_pool',
+        pool_slots=1
     )
     
     insert_task = PythonOperator(
@@ -133,10 +109,12 @@ with DAG(
         provide_context=True
     )
     
-    send_email_task = PythonOperator(
+    send_email_task = EmailOperator(
         task_id='send_email',
-        python_callable=send_email,
-        provide_context=True
+        to="{{ var.json.crypto_email_config.receiver_emails }}",
+        subject="Daily Crypto Prices Report",
+        html_content=REPORT_TEMPLATE,
+        conn_id='smtp_default'
     )
     
     fetch_task >> [insert_task, check_time_task]
@@ -4,7 +4,6 @@ from datetime import datetime, timedelta
 import requests
 import pandas as pd
 import psycopg2
-from psycopg2 import extras
 
 default_args = {
     'owner': 'Ik',
@@ -102,19 +101,27 @@ def load_data(ti):
     cur.execute(create_table_query)
     conn.commit()
 
+    # Single statement: each column is sent as one array and unnested server-side
     insert_query = """
     INSERT INTO random_mcq_game_quiz (
         question, correct_answer, option_1, option_2, 
         option_3, option_4, reference, extra_type, 
         extra_content, is_image
-    ) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+    )
+    SELECT * FROM UNNEST(
+        %s::text[], %s::text[], %s::text[], %s::text[],
+        %s::text[], %s::text[], %s::text[], %s::text[],
+        %s::text[], %s::boolean[]
+    )
     """
 
-    extras.execute_batch(
-        cur,
-        insert_query,
-        df.to_records(index=False).tolist()
-    )
+    df = df.astype(object).where(df.notna(), None)
+    columns = [
+        "question", "correct_answer", "option_1", "option_2",
+        "option_3", "option_4", "reference", "extra_type",
+        "extra_content", "is_image"
+    ]
+    cur.execute(insert_query, [df[col].tolist() for col in columns])
 
     conn.commit()
     cur.close()
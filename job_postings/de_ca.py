@@ -2,10 +2,11 @@ from datetime import datetime, timedelta
 from airflow import DAG
 from airflow.operators.python import PythonOperator
 from airflow.providers.postgres.hooks.postgres import PostgresHook
-from airflow.models import Variable
+from airflow.hooks.base import BaseHook
 from airflow.utils.email import send_email
 import requests
 import json
+import logging
 import pandas as pd
 from sqlalchemy import create_engine
 
@@ -37,7 +38,7 @@ dag = DAG(
 def fetch_data(**kwargs):
     """
     Task to fetch data from LinkedIn API.
-    Uses Airflow Variables for sensitive credentials.
+    Uses an Airflow Connection for sensitive credentials.
     Pushes raw data to XCom for downstream tasks.
     """
     try:
@@ -50,9 +51,10 @@ def fetch_data(**kwargs):
             "agency": "false",
             "Count": 50  
         }
+        conn = BaseHook.get_connection('rapidapi_linkedin_jobs')
         headers = {
-            "x-rapidapi-key": Variable.get("rapidapi_key"),  # Fetch API key from Airflow Variables
-            "x-rapidapi-host": "linkedin-jobs-api2.p.rapidapi.com"
+            "x-rapidapi-key": conn.extra_dejson['key'],
+            "x-rapidapi-host": conn.host
         }
 
         # Execute API request
@@ -64,9 +66,9 @@ def fetch_data(**kwargs):
 
         # Push raw data to XCom for downstream tasks
         kwargs['ti'].xcom_push(key='raw_data', value=data)
-        print(f"Fetched {len(data)} job listings.")
+        logging.info("Fetched %d job listings.", len(data))
     except Exception as e:
-        print(f"Error fetching data: {str(e)}")
+        logging.error("Error fetching data: %s", e)
         raise
 
     def transform_job_data(**kwargs):
@@ -140,9 +142,9 @@ def fetch_data(**kwargs):
                     if_exists="append",
                     index=False
                 )
-                print(f"Loaded {len(df)} records successfully")
+                logging.info("Loaded %d records successfully", len(df))
             else:
-                print("Empty DataFrame - nothing to load")
+                logging.info("Empty DataFrame - nothing to load")
         except Exception as e:
             raise Exception(f"Database operation failed: {str(e)}")
         finally:
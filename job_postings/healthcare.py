@@ -1,14 +1,26 @@
 from datetime import datetime, timedelta
 from airflow import DAG
-from airflow.operators.python import PythonOperator
+from airflow.operators.python import PythonOperator, ShortCircuitOperator
+from airflow.hooks.base import BaseHook
 from airflow.providers.postgres.hooks.postgres import PostgresHook
-from airflow.models import Variable
 from airflow.utils.email import send_email
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import io
+import csv
+import logging
 import pandas as pd
 from sqlalchemy import create_engine
 
+# Keep urllib3's per-request connection logging out of task logs
+logging.getLogger("urllib3").setLevel(logging.WARNING)
+
+# HTTP session for LinkedIn API requests
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])))
+
 # Default arguments for the DAG
 default_args = {
     'owner': 'Ik',  # Owner of the DAG
@@ -26,11 +38,20 @@ dag = DAG(
     tags=['healthcare', 'linkedin']  # Tags for categorization
 )
 
-def fetch_data(**kwargs):
+# Column order of the healthcare_joblist table
+JOBLIST_COLUMNS = (
+    "id", "date_posted", "title", "organization", "organization_url",
+    "date_validthrough", "location_country", "location_locality",
+    "latitude", "longitude", "employment_type", "url",
+    "linkedin_org_employees", "linkedin_org_size", "linkedin_org_industry",
+    "linkedin_org_locations", "seniority"
+)
+
+def fetch_data():
     """
-    Task to fetch data from LinkedIn API.
-    Uses Airflow Variables for sensitive credentials.
-    Pushes raw data to XCom for downstream tasks.
+    Fetch data from LinkedIn API.
+    Uses an Airflow Connection for sensitive credentials.
+    Returns the raw job listings.
     """
     try:
         # API configuration
@@ -40,77 +61,79 @@ def fetch_data(**kwargs):
             "location_filter": "\"United Kingdom\"",
             "count": "50"  # Limit the number of results to 50
         }
+        conn = BaseHook.get_connection('rapidapi_linkedin_jobs')
         headers = {
-            "x-rapidapi-key": Variable.get("rapidapi_key"),  # Fetch API key from Airflow Variables
-            "x-rapidapi-host": "linkedin-jobs-api2.p.rapidapi.com"
+            "x-rapidapi-key": conn.extra_dejson['key'],
+            "x-rapidapi-host": conn.host
         }
         # Execute API request
-        response = requests.get(url, headers=headers, params=querystring)
+        response = SESSION.get(url, headers=headers, params=querystring, timeout=(3, 10))
         response.raise_for_status()  # Raise exception for HTTP errors
         # Parse JSON response
         data = response.json()
-        # Push raw data to XCom for downstream tasks
-        kwargs['ti'].xcom_push(key='raw_data', value=data)
-        print(f"Fetched {len(data)} job listings.")
+        logging.info("Fetched %d job listings.", len(data))
+        return data
     except Exception as e:
-        print(f"Error fetching data: {str(e)}")
+        logging.error("Error fetching data: %s", e)
         raise
 
-def transform_data(**kwargs):
+def transform_data(raw_data):
     """
-    Task to transform API response into structured format.
-    Pulls raw data from XCom and pushes transformed data to XCom.
+    Transform API response into structured format.
+    Returns a list of records in table column order.
     """
     try:
-        # Pull raw data from XCom
-        ti = kwargs['ti']
-        raw_data = ti.xcom_pull(task_ids='fetch_data', key='raw_data')
-        
         # Validate raw data
-        if not isinstance(raw_data, list) or len(raw_data) == 0:
-            raise ValueError("Fetched data is empty or not in expected format (list).")
+        if not isinstance(raw_data, list):
+            raise ValueError("Fetched data is not in expected format (list).")
+        if not raw_data:
+            return []
         
-        # Flatten the nested structure and create a DataFrame
-        flattened_data = []
-        for item in raw_data:
-            try:
-                record = {
-                    "id": item.get("id"),
-                    "date_posted": item.get("date_posted"),
-                    "title": item.get("title"),
-                    "organization": item.get("organization"),
-                    "organization_url": item.get("organization_url"),
-                    "date_validthrough": item.get("date_validthrough"),
-                    "location_country": item["locations_raw"][0]["address"]["addressCountry"] if item.get("locations_raw") else None,
-                    "location_locality": item["locations_raw"][0]["address"]["addressLocality"] if item.get("locations_raw") else None,
-                    "latitude": item["locations_raw"][0].get("latitude") if item.get("locations_raw") else None,
-                    "longitude": item["locations_raw"][0].get("longitude") if item.get("locations_raw") else None,
-                    "employment_type": ", ".join(item.get("employment_type", [])),
-                    "url": item.get("url"),
-                    "linkedin_org_employees": item.get("linkedin_org_employees"),
-                    "linkedin_org_size": item.get("linkedin_org_size"),
-                    "linkedin_org_industry": item.get("linkedin_org_industry"),
-                    "linkedin_org_locations": ", ".join(item.get("linkedin_org_locations", [])),
-                    "seniority": item.get("seniority")
-                }
-                flattened_data.append(record)
-            except Exception as e:
-                print(f"Error processing record {item.get('id')}: {str(e)}")
-                continue
+        # Flatten the nested structure with pandas instead of a per-record loop
+        df = pd.json_normalize(raw_data).reindex(columns=[
+            "id", "date_posted", "title", "organization", "organization_url",
+            "date_validthrough", "locations_raw", "employment_type", "url",
+            "linkedin_org_employees", "linkedin_org_size", "linkedin_org_industry",
+            "linkedin_org_locations", "seniority"
+        ])
         
-        # Convert to DataFrame
-        df = pd.DataFrame(flattened_data)
+        # Only the first listed location is kept for each posting
+        first_location = df["locations_raw"].apply(lambda locs: locs[0] if isinstance(locs, list) and locs else {})
+        locations = pd.json_normalize(first_location.tolist()).reindex(columns=["address.addressCountry", "address.addressLocality", "latitude", "longitude"])
+        locations.index = df.index
+        df = df.join(locations.rename(columns={
+            "address.addressCountry": "location_country",
+            "address.addressLocality": "location_locality",
+        }))
         
-        # Validate DataFrame
-        if df.empty:
-            raise ValueError("No valid records found after transformation.")
+        # Join list-valued columns into comma-separated strings
+        for col in ("employment_type", "linkedin_org_locations"):
+            df[col] = df[col].astype(object).str.join(", ").fillna("")
         
-        # Push transformed data to XCom as JSON
-        kwargs['ti'].xcom_push(key='transformed_data', value=df.to_json(orient='records'))
-        print(f"Transformed {len(df)} records.")
+        # Select table columns, keep integer columns integral when values are missing,
+        # and replace missing values with None for the database
+        df = df[list(JOBLIST_COLUMNS)].convert_dtypes().astype(object)
+        flattened_data = df.where(df.notna(), None).to_dict("records")
+        logging.info("Transformed %d records.", len(flattened_data))
+        return flattened_data
     except Exception as e:
-        print(f"Error transforming data: {str(e)}")
+        logging.error("Error transforming data: %s", e)
         raise
+
+def fetch_and_transform(**kwargs):
+    """
+    Task to fetch and transform job listings in one step.
+    Pushes only the insert-ready records to XCom.
+    """
+    records = transform_data(fetch_data())
+    kwargs['ti'].xcom_push(key='transformed_data', value=records)
+
+def has_data(**kwargs):
+    """
+    Short-circuit check that skips the load when the API returned no jobs.
+    """
+    records = kwargs['ti'].xcom_pull(task_ids='fetch_and_transform', key='transformed_data')
+    return bool(records)
     
 def load_to_postgres(**kwargs):
     """
@@ -119,59 +142,60 @@ def load_to_postgres(**kwargs):
     try:
         # Pull transformed data from XCom
         ti = kwargs['ti']
-        transformed_data = ti.xcom_pull(task_ids='transform_data', key='transformed_data')
-        df = pd.read_json(transformed_data, orient='records')
+        records = ti.xcom_pull(task_ids='fetch_and_transform', key='transformed_data')
 
-        
         # Initialize PostgresHook
         pg_hook = PostgresHook(postgres_conn_id="postgres_dwh")
         conn = pg_hook.get_conn()
         cursor = conn.cursor()
 
-        # Convert DataFrame to list of tuples (matches table schema)
-        data_tuples = [tuple(x) for x in df.to_numpy()]
+        # Serialize the records to an in-memory CSV buffer in table column order
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for record in records:
+            writer.writerow(['\\N' if record[col] is None else record[col] for col in JOBLIST_COLUMNS])
+        buf.seek(0)
 
         # Use PostgreSQL COPY command for efficient bulk insert
-        from psycopg2.extras import execute_batch
-        
-        insert_sql = f"""
-            INSERT INTO healthcare_joblist (
+        copy_sql = """
+            COPY healthcare_joblist (
                 id, date_posted, title, organization, organization_url,
                 date_validthrough, location_country, location_locality,
                 latitude, longitude, employment_type, url,
                 linkedin_org_employees, linkedin_org_size, linkedin_org_industry,
                 linkedin_org_locations, seniority
-            ) VALUES ({','.join(['%s']*len(df.columns))})
+            ) FROM STDIN WITH (FORMAT CSV, NULL '\\N')
         """
-
-        # Batch insert with execute_batch
-        execute_batch(cursor, insert_sql, data_tuples, page_size=100)
+        cursor.copy_expert(copy_sql, buf)
         conn.commit()
 
-        print(f"Successfully inserted {len(df)} records")
+        logging.info("Successfully inserted %d records", len(records))
         
     except Exception as e:
         conn.rollback()
-        print(f"Error loading data: {str(e)}")
+        logging.error("Error loading data: %s", e)
         raise
     finally:
         cursor.close()
         conn.close()
         
 with dag:
-    # Task 1: Fetch data from LinkedIn API
-    fetch_task = PythonOperator(
-        task_id='fetch_data',
-        python_callable=fetch_data,
-        provide_context=True
+    # Task 1: Fetch data from LinkedIn API and transform it
+    # Runs in rapidapi_pool, so the slot is also held during the transform
+    fetch_transform_task = PythonOperator(
+        task_id='fetch_and_transform',
+        python_callable=fetch_and_transform,
+        provide_context=True,
+        pool='rapidapi_pool',
+        pool_slots=1
     )
-    # Task 2: Transform the fetched data
-    transform_task = PythonOperator(
-        task_id='transform_data',
-        python_callable=transform_data,
+    # Skip the load when the API returned nothing
+    has_data_task = ShortCircuitOperator(
+        task_id='has_data',
+        python_callable=has_data,
         provide_context=True
     )
-    # Task 3: Load transformed data into PostgreSQL
+    # Task 2: Load transformed data into PostgreSQL
     load_task = PythonOperator(
         task_id='load_to_postgres',
         python_callable=load_to_postgres,
@@ -179,5 +203,4 @@ with dag:
     )
 
     # Define task dependencies
-    fetch_task >> transform_task >> load_task
-
+    fetch_transform_task >> has_data_task >> load_task
@@ -3,11 +3,11 @@ from airflow import DAG
 from airflow.operators.python import PythonOperator
 from airflow.providers.postgres.hooks.postgres import PostgresHook
 from airflow.models import Variable
+from airflow.hooks.base import BaseHook
 from airflow.utils.email import send_email
 import pandas as pd
 import requests
 import logging
-import io
 
 # ====================================================
 # 1. AIRFLOW SETUP AND CONFIGURATION
@@ -41,11 +41,11 @@ dag = DAG(
 def fetch_data(**kwargs):
     """
     Task to fetch data from LinkedIn API
-    Uses Airflow Variables for sensitive credentials
+    Uses an Airflow Connection for sensitive credentials
     """
     try:
-        # Get credentials from Airflow Variables
-        api_key = Variable.get("rapidapi_key")
+        # Get the RapidAPI account key shared with the other LinkedIn DAGs
+        api_key = BaseHook.get_connection('rapidapi_linkedin_jobs').extra_dejson['key']
         # API configuration
         url = "https://linkedin-data-scraper.p.rapidapi.com/search_jobs"
         headers = {
@@ -186,9 +186,7 @@ def generate_email_report(**context):
             'avg_applicants': df['NoOfApplicants'].mean(),
             'common_experience_level': df['ExperienceLevel'].mode()[0] if not df.empty else 'N/A'
         }
-        csv_buffer = io.StringIO()
-        df.to_csv(csv_buffer, index=False)
-        csv_content = csv_buffer.getvalue()
+        csv_content = df.to_csv(index=False)
         subject = f"Pharmacist Jobs Report - {execution_date}"
         html_content = f"""
         Daily Jobs Report ({execution_date})
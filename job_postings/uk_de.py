@@ -64,7 +64,8 @@ def load_to_postgres(**kwargs):
             VALUES (%s, %s, %s)
             ON CONFLICT (job_title, locations, date_posted) DO NOTHING;
         """
-        records = df.replace({pd.NA: None}).values.tolist()
+        # Stream row tuples straight from the frame's columns
+        records = df.replace({pd.NA: None}).itertuples(index=False, name=None)
         cursor.executemany(insert_query, records)
         conn.commit()
         
@@ -2,7 +2,8 @@ from airflow import DAG
 from airflow.operators.python import PythonOperator
 from airflow.providers.postgres.hooks.postgres import PostgresHook
 from datetime import datetime, timedelta
-import requests
+import asyncio
+import aiohttp
 import json
 import pandas as pd
 
@@ -24,21 +25,30 @@ with DAG(
     catchup=False,
 ) as dag:
 
+    # Function to fetch a single joke category
+    async def fetch_joke_category(session, url):
+        async with session.get(url) as response:
+            if response.status == 200:
+                jokes = await response.json()
+                print("JSON data from API:", json.dumps(jokes, indent=4))
+                return jokes
+            print(f"Failed to retrieve data from {url}")
+            return []
+
+    # Function to fetch all joke categories concurrently over one session
+    async def fetch_all_jokes(urls):
+        timeout = aiohttp.ClientTimeout(connect=3, sock_read=10)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            results = await asyncio.gather(*[fetch_joke_category(session, url) for url in urls])
+        return [joke for jokes in results for joke in jokes]
+
     # Function to fetch jokes
     def fetch_jokes():
         urls = {
             "general": "https://official-joke-api.appspot.com/jokes/general/ten",
             "programming": "https://official-joke-api.appspot.com/jokes/programming/ten"
         }
-        all_jokes = []
-        for url in urls.values():
-            response = requests.get(url)
-            if response.status_code == 200:
-                jokes = response.json()
-                print("JSON data from API:", json.dumps(jokes, indent=4))
-                all_jokes.extend(jokes)
-            else:
-                print(f"Failed to retrieve data from {url}")
+        all_jokes = asyncio.run(fetch_all_jokes(urls.values()))
         
         # Save fetched jokes as a JSON file in the Airflow tmp folder
         with open('/tmp/jokes.json', 'w') as f:
@@ -1,5 +1,6 @@
 from airflow import DAG
 from airflow.operators.python import PythonOperator
+from airflow.hooks.base import BaseHook
 from airflow.providers.postgres.hooks.postgres import PostgresHook
 from datetime import datetime, timedelta
 import requests
@@ -26,9 +27,10 @@ with DAG(
     # Function to fetch metal prices from API
     def fetch_metal_prices():
         url = "https://gold-price-live.p.rapidapi.com/get_metal_prices"
+        conn = BaseHook.get_connection('rapidapi_gold_price')
         headers = {
-            "x-rapidapi-key": "7b66ced988msh253ab4a526f3148p1eed78jsn4d8bcaa48242",  # Store securely in Airflow connections
-            "x-rapidapi-host": "gold-price-live.p.rapidapi.com"
+            "x-rapidapi-key": conn.extra_dejson['key'],
+            "x-rapidapi-host": conn.host
         }
         
         response = requests.get(url, headers=headers)
@@ -1,11 +1,18 @@
 from airflow import DAG
 from airflow.operators.python import PythonOperator
+from airflow.hooks.base import BaseHook
 from airflow.providers.postgres.hooks.postgres import PostgresHook
+from psycopg2.extras import execute_values
 from datetime import datetime, timedelta
 import requests
-import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 
+# HTTP session for quotes API requests
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])))
+
 # Default DAG arguments
 default_args = {
     'owner': 'Ik',
@@ -27,11 +34,12 @@ with DAG(
     # Function to fetch quotes from API
     def fetch_quotes():
         url = "https://quotes15.p.rapidapi.com/quotes/random/"
+        conn = BaseHook.get_connection('rapidapi_quotes15')
         headers = {
-            "x-rapidapi-key": "7b66ced988msh253ab4a526f3148p1eed78jsn4d8bcaa48242",  # Secure API key storage recommended
-            "x-rapidapi-host": "quotes15.p.rapidapi.com"
+            "x-rapidapi-key": conn.extra_dejson['key'],
+            "x-rapidapi-host": conn.host
         }
-        response = requests.get(url, headers=headers)
+        response = SESSION.get(url, headers=headers, timeout=(3, 10))
         if response.status_code == 200:
             data = response.json()
             with open('/tmp/quotes.json', 'w') as f:
@@ -39,12 +47,12 @@ with DAG(
         else:
             raise Exception(f"Failed to fetch data: {response.status_code}")
 
-    # Function to transform JSON data into DataFrame format
+    # Function to transform JSON data into insert-ready records
     def transform_quotes(**kwargs):
         with open('/tmp/quotes.json', 'r') as f:
             data = json.load(f)
 
-        df = pd.DataFrame([{
+        return [{
             'quote_id': data['id'],
             'quote_content': data['content'],
             'quote_url': data['url'],
@@ -53,17 +61,12 @@ with DAG(
             'originator_name': data['originator']['name'],
             'originator_url': data['originator']['url'],
             'tags': ', '.join(data['tags'])  # Convert list to string
-        }])
-
-        return df.to_dict('records')
+        }]
 
-    # Function to load transformed data into PostgreSQL
-    def load_quotes(**kwargs):
+    # Function to create the quotes table, run as its own task off the load path
+    def create_quotes_table():
         hook = PostgresHook(postgres_conn_id='postgres_dwh')
-        conn = hook.get_conn()
-        cursor = conn.cursor()
-
-        create_table_query = """
+        hook.run("""
         CREATE TABLE IF NOT EXISTS quotes (
             id SERIAL PRIMARY KEY,
             quote_id INTEGER UNIQUE,
@@ -75,27 +78,37 @@ with DAG(
             originator_url TEXT,
             tags TEXT
         );
-        """
-        cursor.execute(create_table_query)
+        -- Ensure schema is up-to-date (add missing quote_id if not exists)
+        ALTER TABLE quotes ADD COLUMN IF NOT EXISTS quote_id INTEGER;
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_constraint
+                WHERE conrelid = 'quotes'::regclass AND conname = 'quotes_quote_id_key'
+            ) THEN
+                ALTER TABLE quotes ADD CONSTRAINT quotes_quote_id_key UNIQUE (quote_id);
+            END IF;
+        END $$;
+        """)
 
-        # Ensure schema is up-to-date (add missing quote_id if not exists)
-        cursor.execute("SELECT column_name FROM information_schema.columns WHERE table_name='quotes';")
-        existing_columns = [row[0] for row in cursor.fetchall()]
-        if 'quote_id' not in existing_columns:
-            cursor.execute("ALTER TABLE quotes ADD COLUMN quote_id INTEGER UNIQUE;")
-            conn.commit()
+    # Function to load transformed data into PostgreSQL
+    def load_quotes(**kwargs):
+        hook = PostgresHook(postgres_conn_id='postgres_dwh')
+        conn = hook.get_conn()
+        cursor = conn.cursor()
 
         ti = kwargs['ti']
         quotes = ti.xcom_pull(task_ids='transform_quotes')
 
         insert_query = """
         INSERT INTO quotes (quote_id, quote_content, quote_url, quote_language, originator_id, originator_name, originator_url, tags)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        VALUES %s
         ON CONFLICT (quote_id) DO NOTHING;
         """
 
-        for quote in quotes:
-            cursor.execute(insert_query, (
+        # Insert all quotes in a single multi-row statement
+        rows = [
+            (
                 quote['quote_id'],
                 quote['quote_content'],
                 quote['quote_url'],
@@ -104,7 +117,11 @@ with DAG(
                 quote['originator_name'],
                 quote['originator_url'],
                 quote['tags']
-            ))
+            )
+            for quote in quotes
+            if quote['quote_id'] is not None
+        ]
+        execute_values(cursor, insert_query, rows, page_size=500)
 
         conn.commit()
         cursor.close()
@@ -113,7 +130,14 @@ with DAG(
     # Define the tasks
     fetch_task = PythonOperator(
         task_id='fetch_quotes',
-        python_callable=fetch_quotes
+        python_callable=fetch_quotes,
+        pool='rapidapi_pool',
+        pool_slots=1
+    )
+
+    create_table_task = PythonOperator(
+        task_id='create_quotes_table',
+        python_callable=create_quotes_table
     )
 
     transform_task = PythonOperator(
@@ -130,3 +154,4 @@ with DAG(
 
     # Set task dependencies
     fetch_task >> transform_task >> load_task
+    create_table_task >> load_task
@@ -1,8 +1,9 @@
 from airflow import DAG
 from airflow.operators.python import PythonOperator
+from airflow.hooks.base import BaseHook
+from airflow.providers.postgres.hooks.postgres import PostgresHook
 from datetime import datetime
 import requests
-import psycopg2
 
 default_args = {
     'owner': 'Ikeengr',
@@ -22,9 +23,10 @@ dag = DAG(
 def fetch_quote(**kwargs):
     url = "https://quotes-api12.p.rapidapi.com/quotes/random"
     querystring = {"type": "success"}
+    conn = BaseHook.get_connection('rapidapi_quotes_api12')
     headers = {
-        "x-rapidapi-key": "efbc12a764msh39a81e663d3e104p1e76acjsn337fd1d56751",
-        "x-rapidapi-host": "quotes-api12.p.rapidapi.com"
+        "x-rapidapi-key": conn.extra_dejson['key'],
+        "x-rapidapi-host": conn.host
     }
 
     response = requests.get(url, headers=headers, params=querystring)
@@ -39,13 +41,7 @@ def load_to_postgres(**kwargs):
     ti = kwargs['ti']
     data = ti.xcom_pull(task_ids='fetch_quote', key='quote_data')
 
-    conn = psycopg2.connect(
-        dbname="dwh",
-        user="ikeengr",
-        password="DataEngineer247",
-        host="89.40.0.150",
-        port="5432"
-    )
+    conn = PostgresHook(postgres_conn_id='postgres_dwh').get_conn()
     cur = conn.cursor()
 
     # Ensure table exists
@@ -73,6 +69,8 @@ fetch_task = PythonOperator(
     task_id='fetch_quote',
     python_callable=fetch_quote,
     provide_context=True,
+    pool='rapidapi_pool',
+    pool_slots=1,
     dag=dag
 )
 